@@ -58,6 +58,32 @@ class AsyncHttpRequest:
         False,
       )
     
+    async def SummarizeHistory(
+        self,
+        summary: str,history: List[_baml.types.Message],
+        baml_options: _baml.BamlCallOptionsModApi = {},
+    ) -> baml_py.HTTPRequest:
+      __tb__ = baml_options.get("tb", None)
+      if __tb__ is not None:
+        tb = __tb__._tb # type: ignore (we know how to use this private attribute)
+      else:
+        tb = None
+      __cr__ = baml_options.get("client_registry", None)
+      env = _baml.env_vars_to_dict(baml_options.get("env", {}))
+
+      return await self.__runtime.build_request(
+        "SummarizeHistory",
+        {
+          "summary": summary,
+          "history": history,
+        },
+        self.__ctx_manager.get(),
+        tb,
+        __cr__,
+        env,
+        False,
+      )
+    
 
 
 class AsyncHttpStreamRequest:
@@ -97,6 +123,32 @@ class AsyncHttpStreamRequest:
         True,
       )
     
+    async def SummarizeHistory(
+        self,
+        summary: str,history: List[_baml.types.Message],
+        baml_options: _baml.BamlCallOptionsModApi = {},
+    ) -> baml_py.HTTPRequest:
+      __tb__ = baml_options.get("tb", None)
+      if __tb__ is not None:
+        tb = __tb__._tb # type: ignore (we know how to use this private attribute)
+      else:
+        tb = None
+      __cr__ = baml_options.get("client_registry", None)
+      env = _baml.env_vars_to_dict(baml_options.get("env", {}))
+
+      return await self.__runtime.build_request(
+        "SummarizeHistory",
+        {
+          "summary": summary,
+          "history": history,
+        },
+        self.__ctx_manager.get(),
+        tb,
+        __cr__,
+        env,
+        True,
+      )
+    
 
 
 __all__ = ["AsyncHttpRequest", "AsyncHttpStreamRequest"]
\ No newline at end of file
@@ -16,7 +16,7 @@
 
 file_map = {
     
-    "build.baml": "class CodeChanges {\n  plan string @stream.with_state \n  files File[]\n  package_json string\n}\n\nclass File {\n    path string\n    content string\n    @@stream.done\n}\n\nclass Message {\n    role string\n    content string\n}\n\nclient<llm> OpenAIClient {\n  provider openai\n  options {\n    model o4-mini\n    api_key env.OPENAI_API_KEY\n  }\n}\n\nfunction EditCode(history: Message[], feedback: string, code_files: File[], package_json: string) -> CodeChanges {\n    client OpenAIClient\n\n    prompt #\"\n    {{ _.role(\"system\") }}\n    You are BeamO, an AI editor that creates and modifies web applications. You assist users by making changes to their code in real-time. You understand that users can see a live preview of their application while you make code changes.\n\n    <guidelines>\n    Edit the code files based on the feedback/feature request, returning the updated files. If anything is unused, please remove it.\n    File paths are delimited by <FILEPATH> tags, Code is delimited by <CODE> tags.. You can add new files if you need to.\n    Make sure you use the absolute file path for the code files (which is what you will receive).\n    Never MODIFY main.tsx!\n\n    Please start your message by explaining your plan for the changes you're going to make.\n\n    <important_guidelines>\n    Here is how you should approach the code changes:\n     - Come up with a list of CORE FEATURES that you need to implement that are relevant to the topic the user is asking about.\n     - Then, come up with a design inspiration relevant to the topic the user is asking about that informs the formatting / design of the app.\n     - If appropriate for the feedback or topic, include multiple pages with routing between them.\n     - Ensure every component you create is actually being used in the app and is visible to the user.\n     - Do not use any dependencies that are not installed in the PACKAGE.JSON\n     - Make sure you use the shadcn/ui library.\n     - Make sure you use absolute file paths for the code files.\n     - Make sure the contents will render correctly inside of an iframe\n    </important_guidelines>\n  \n    # Coding guidelines\n\n    - Ensure you make the paths to scripts etc relative, and don't include things that haven't created yet.\n    - ALWAYS generate responsive designs.\n    - ALWAYS try to use the shadcn/ui library.\n    - Don't catch errors with try/catch blocks unless specifically requested by the user. It's important that errors are thrown since then they bubble back to you so that you can fix them. \n    - Tailwind CSS: always use Tailwind CSS for styling components. Utilize Tailwind classes extensively for layout, spacing, colors, and other design aspects.\n    - 'Switch' is not a valid export in the newer versions of 'react-router-dom'. In modern versions, 'Switch' has been replaced with 'Routes'. Use 'Routes' instead.\n    - Available packages and libraries:\n      - The lucide-react package is installed for icons.\n      - The recharts library is available for creating charts and graphs.\n      - Use prebuilt components from the shadcn/ui library after importing them. Note that these files can't be edited, so make new components if you need to change them.\n      - Do not hesitate to extensively use console logs to follow the flow of the code. This will be very helpful when debugging.\n      - Do not include any tags like <CODE> <NEWFILE> <FILEPATH> in your response.\n      - Make sure App.tsx points to the new features you've created.\n    </guidelines>\n\n    Here is the conversation history between you and the user:\n      {% for msg in history %}\n      {{ _.role(msg.role) }}\n      {{ msg.content }}\n      {% endfor %}\n\n    {{ _.role(\"user\") }}\n    Given the following feedback: \"{{ feedback }}\"\n  \n    Edit my code based on the feedback to produce the desired feature or changes.\n    Focus on the specific feedback, and don't make changes to existing codethat are not relevant to the feedback.\n    Make sure you use the dependencies in the package.json to create the code changes, nothing else.\n    Make sure you use ABSOLUTE FILE PATHS for the code files, not relative paths.\n    Make sure the contents will render correctly inside of an iframe.\n\n    {% for file in code_files %}\n      <filepath> {{ file.path }} </filepath>\n      <code>\n      {{ file.content }}\n      </code>\n    {% endfor %}\n\n    <package.json>\n    {{ package_json }}\n    </package.json>\n\n    {{ ctx.output_format }}\n    \"#\n\n}\ntest TestEditCode {\n    functions [EditCode]\n    args {\n      history [\n        {\n          role \"user\"\n          content \"Make a dashboard with a table and a chart\"\n        },\n        {\n          role \"assistant\"\n          content \"I've created a dashboard with a table and a chart\"\n        },\n      ]\n    code_files [\n      {\n        path \"src/index.js\"\n        content \"const a = 1;\"\n      }\n      {\n        path \"src/main_app.js\"\n        content \"const b = 2;\"\n      }\n    ]\n    package_json \"{ \\\"dependencies\\\": { \\\"react\\\": \\\"^18.2.0\\\", \\\"react-dom\\\": \\\"^18.2.0\\\" } }\"\n    feedback \"Build a dashboard with a table and a chart\"\n  }\n}",
+    "build.baml": "class CodeChanges {\n  plan string @stream.with_state \n  files File[]\n  package_json string\n}\n\nclass File {\n    path string\n    content string\n    @@stream.done\n}\n\nclass Message {\n    role string\n    content string\n}\n\nclient<llm> OpenAIClient {\n  provider openai\n  options {\n    model o4-mini\n    api_key env.OPENAI_API_KEY\n  }\n}\n\nfunction EditCode(history: Message[], feedback: string, code_files: File[], package_json: string) -> CodeChanges {\n    client OpenAIClient\n\n    prompt #\"\n    {{ _.role(\"system\") }}\n    You are BeamO, an AI editor that creates and modifies web applications. You assist users by making changes to their code in real-time. You understand that users can see a live preview of their application while you make code changes.\n\n    <guidelines>\n    Edit the code files based on the feedback/feature request, returning the updated files. If anything is unused, please remove it.\n    File paths are delimited by <FILEPATH> tags, Code is delimited by <CODE> tags.. You can add new files if you need to.\n    Make sure you use the absolute file path for the code files (which is what you will receive).\n    Never MODIFY main.tsx!\n\n    Please start your message by explaining your plan for the changes you're going to make.\n\n    <important_guidelines>\n    Here is how you should approach the code changes:\n     - Come up with a list of CORE FEATURES that you need to implement that are relevant to the topic the user is asking about.\n     - Then, come up with a design inspiration relevant to the topic the user is asking about that informs the formatting / design of the app.\n     - If appropriate for the feedback or topic, include multiple pages with routing between them.\n     - Ensure every component you create is actually being used in the app and is visible to the user.\n     - Do not use any dependencies that are not installed in the PACKAGE.JSON\n     - Make sure you use the shadcn/ui library.\n     - Make sure you use absolute file paths for the code files.\n     - Make sure the contents will render correctly inside of an iframe\n    </important_guidelines>\n  \n    # Coding guidelines\n\n    - Ensure you make the paths to scripts etc relative, and don't include things that haven't created yet.\n    - ALWAYS generate responsive designs.\n    - ALWAYS try to use the shadcn/ui library.\n    - Don't catch errors with try/catch blocks unless specifically requested by the user. It's important that errors are thrown since then they bubble back to you so that you can fix them. \n    - Tailwind CSS: always use Tailwind CSS for styling components. Utilize Tailwind classes extensively for layout, spacing, colors, and other design aspects.\n    - 'Switch' is not a valid export in the newer versions of 'react-router-dom'. In modern versions, 'Switch' has been replaced with 'Routes'. Use 'Routes' instead.\n    - Available packages and libraries:\n      - The lucide-react package is installed for icons.\n      - The recharts library is available for creating charts and graphs.\n      - Use prebuilt components from the shadcn/ui library after importing them. Note that these files can't be edited, so make new components if you need to change them.\n      - Do not hesitate to extensively use console logs to follow the flow of the code. This will be very helpful when debugging.\n      - Do not include any tags like <CODE> <NEWFILE> <FILEPATH> in your response.\n      - Make sure App.tsx points to the new features you've created.\n    </guidelines>\n\n    Here is the current code of the application:\n    <package.json>\n    {{ package_json }}\n    </package.json>\n\n    {% for file in code_files %}\n      <filepath> {{ file.path }} </filepath>\n      <code>\n      {{ file.content }}\n      </code>\n    {% endfor %}\n\n    Here is the conversation history between you and the user:\n      {% for msg in history %}\n      {{ _.role(msg.role) }}\n      {{ msg.content }}\n      {% endfor %}\n\n    {{ _.role(\"user\") }}\n    Given the following feedback: \"{{ feedback }}\"\n  \n    Edit my code based on the feedback to produce the desired feature or changes.\n    Focus on the specific feedback, and don't make changes to existing codethat are not relevant to the feedback.\n    Make sure you use the dependencies in the package.json to create the code changes, nothing else.\n    Make sure you use ABSOLUTE FILE PATHS for the code files, not relative paths.\n    Make sure the contents will render correctly inside of an iframe.\n\n    {{ ctx.output_format }}\n    \"#\n\n}\n\nfunction SummarizeHistory(summary: string, history: Message[]) -> string {\n    client OpenAIClient\n\n    prompt #\"\n    {{ _.role(\"system\") }}\n    You maintain a running summary of a conversation between a user and AuraCode, an AI engineer building a React application for them.\n    Fold the new messages into the existing summary. Keep every requirement, design decision and feature the user asked for, and what was built in response.\n    Drop pleasantries and anything superseded by a later request. Reply with the updated summary only, in a few short paragraphs.\n\n    {{ _.role(\"user\") }}\n    Existing summary:\n    {{ summary }}\n\n    New messages:\n      {% for msg in history %}\n      {{ msg.role }}: {{ msg.content }}\n      {% endfor %}\n    \"#\n}\ntest TestEditCode {\n    functions [EditCode]\n    args {\n      history [\n        {\n          role \"user\"\n          content \"Make a dashboard with a table and a chart\"\n        },\n        {\n          role \"assistant\"\n          content \"I've created a dashboard with a table and a chart\"\n        },\n      ]\n    code_files [\n      {\n        path \"src/index.js\"\n        content \"const a = 1;\"\n      }\n      {\n        path \"src/main_app.js\"\n        content \"const b = 2;\"\n      }\n    ]\n    package_json \"{ \\\"dependencies\\\": { \\\"react\\\": \\\"^18.2.0\\\", \\\"react-dom\\\": \\\"^18.2.0\\\" } }\"\n    feedback \"Build a dashboard with a table and a chart\"\n  }\n}",
 }
 
 def get_baml_files():
@@ -55,6 +55,31 @@ class HttpRequest:
         False,
       )
     
+    def SummarizeHistory(
+        self,
+        summary: str,history: List[_baml.types.Message],
+        baml_options: _baml.BamlCallOptionsModApi = {},
+    ) -> baml_py.HTTPRequest:
+      __tb__ = baml_options.get("tb", None)
+      if __tb__ is not None:
+        tb = __tb__._tb # type: ignore (we know how to use this private attribute)
+      else:
+        tb = None
+      __cr__ = baml_options.get("client_registry", None)
+      env = _baml.env_vars_to_dict(baml_options.get("env", {}))
+
+      return self.__runtime.build_request_sync(
+        "SummarizeHistory",
+        {
+          "summary": summary,"history": history,
+        },
+        self.__ctx_manager.get(),
+        tb,
+        __cr__,
+        env,
+        False,
+      )
+    
 
 
 class HttpStreamRequest:
@@ -91,6 +116,31 @@ class HttpStreamRequest:
         True,
       )
     
+    def SummarizeHistory(
+        self,
+        summary: str,history: List[_baml.types.Message],
+        baml_options: _baml.BamlCallOptionsModApi = {},
+    ) -> baml_py.HTTPRequest:
+      __tb__ = baml_options.get("tb", None)
+      if __tb__ is not None:
+        tb = __tb__._tb # type: ignore (we know how to use this private attribute)
+      else:
+        tb = None
+      __cr__ = baml_options.get("client_registry", None)
+      env = _baml.env_vars_to_dict(baml_options.get("env", {}))
+
+      return self.__runtime.build_request_sync(
+        "SummarizeHistory",
+        {
+          "summary": summary,"history": history,
+        },
+        self.__ctx_manager.get(),
+        tb,
+        __cr__,
+        env,
+        True,
+      )
+    
 
 
 __all__ = ["HttpRequest", "HttpStreamRequest"]
\ No newline at end of file
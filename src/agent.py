@@ -1,21 +1,27 @@
-import json
+import asyncio
+import hashlib
 import os
 import time
 import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from enum import Enum
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from mcp.client.session import ClientSession
     from mcp.types import CallToolResult, Tool
 
 
+import orjson
+from anyio import BrokenResourceError, ClosedResourceError
 from beam import Image, PythonVersion, realtime
 
-from baml_client.sync_client import BamlSyncClient, b
+from baml_client.async_client import BamlAsyncClient, b
 from baml_client.types import Message as ConvoMessage
 
-from .client import mcp_session
+from .client import close_session, get_session
 
 
 class MessageType(Enum):
@@ -32,7 +38,11 @@ class MessageType(Enum):
     UPDATE_COMPLETED = "update_completed"
 
 
-@dataclass
+# Enum .value goes through a property descriptor; look the wire names up directly
+MESSAGE_TYPE_VALUES = {message_type: message_type.value for message_type in MessageType}
+
+
+@dataclass(slots=True, frozen=True)
 class Message:
     id: str
     timestamp: int
@@ -44,24 +54,62 @@ class Message:
         return cls(
             type=type,
             data=data,
-            id=id or str(uuid.uuid4()),
+            # Streamed partials pass their message id, so only new messages pay for a uuid
+            id=id if id is not None else uuid.uuid4().hex,
             timestamp=time.time_ns() // 1_000_000,
         )
 
     def to_dict(self) -> dict:
         return {
             "id": self.id,
-            "type": self.type.value,
+            "type": MESSAGE_TYPE_VALUES[self.type],
             "data": self.data,
             "timestamp": self.timestamp,
         }
 
 
+def _agent_partial(id: str, text: str) -> dict:
+    # Sent for every streamed chunk of the plan, so build the wire dict directly
+    # instead of allocating a Message just to convert it
+    return {
+        "id": id,
+        "type": MESSAGE_TYPE_VALUES[MessageType.AGENT_PARTIAL],
+        "data": {"text": text},
+        "timestamp": time.time_ns() // 1_000_000,
+    }
+
+
+def _content_digest(content: str | bytes) -> bytes:
+    # BLAKE2b is cheaper than SHA-256 on small buffers and plenty for change detection
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+# Tool responses above this size are decoded in a worker thread so that parsing a
+# whole source tree doesn't stall the other websocket sessions on the event loop
+LARGE_PAYLOAD_CHARS = 65536
+
+
+async def _loads(text: str):
+    if len(text) > LARGE_PAYLOAD_CHARS:
+        return await asyncio.to_thread(orjson.loads, text)
+    return orjson.loads(text)
+
+
 class ToolType(Enum):
     CREATE_APP_ENVIRONMENT = "create_app_environment"
     LOAD_CODE = "load_code"
     EDIT_CODE = "edit_code"
     GET_CODE_FOR_DISPLAY = "get_code_for_display"
+    STAGE_CODE = "stage_code"
+    COMMIT_CODE = "commit_code"
+    DISCARD_CODE = "discard_code"
+
+
+# Most recent history messages (6 user/assistant turns) sent verbatim to the LLM;
+# older turns are folded into a running summary
+HISTORY_WINDOW = 12
 
 
 class Agent:
@@ -77,7 +125,7 @@ class Agent:
     def __init__(self, *, mcp_url: str):
         # BAML Client: Handles OpenAI API communication with structured prompts/responses
         # Uses RPC-style function calls to generate code based on user feedback
-        self.model_client: BamlSyncClient = b
+        self.model_client: BamlAsyncClient = b
         
         # MCP Server URL: Endpoint for Model Context Protocol tools
         # Provides sandbox file operations, command execution, environment management
@@ -90,72 +138,126 @@ class Agent:
         self.init_data: dict = {}
         
         # Conversation history maintained for context in multi-turn interactions
-        self.history: list[dict] = []
-        
+        self.history: deque[ConvoMessage] = deque(maxlen=HISTORY_WINDOW)
+
+        # Running summary of the turns that have slid out of the history window
+        self._summary: str = ""
+        self._summary_message: ConvoMessage | None = None
+        self._summary_task: asyncio.Task | None = None
+
+    async def _call_with_reconnect(self, call: Callable[["ClientSession"], Awaitable]):
+        # The initialized session is cached per URL in .client, so tool calls reuse
+        # one SSE connection instead of re-doing the handshake every time
+        session = await get_session(self.mcp_url)
+        try:
+            return await call(session)
+        except (ClosedResourceError, BrokenResourceError):
+            # The SSE stream dropped; open a fresh session and retry once
+            try:
+                await close_session(self.mcp_url, session)
+            except Exception as e:
+                print(f"Error closing stale MCP session: {e}")
+
+            return await call(await get_session(self.mcp_url))
+
+    async def _call_tool(self, tool: ToolType, arguments: dict) -> "CallToolResult":
+        response = await self._call_with_reconnect(
+            lambda session: session.call_tool(name=tool.value, arguments=arguments)
+        )
+        if response.isError:
+            raise RuntimeError(f"{tool.value} failed: {response.content[0].text}")
+        return response
+
     #MCP tool calls
     async def init(self):
-        await self.load_tools()
+        # Tools are loaded once in _load_agent and shared by every session on this worker
         await self.create_app_environment()
 
     async def load_tools(self):
-        async with mcp_session(self.mcp_url) as session:
-            self.tools = await session.list_tools()
+        self.tools = await self._call_with_reconnect(
+            lambda session: session.list_tools()
+        )
 
     async def create_app_environment(self):
-        async with mcp_session(self.mcp_url) as session:
-            response: CallToolResult = await session.call_tool(
-                name=ToolType.CREATE_APP_ENVIRONMENT.value,
-                arguments={},
-            )
-            self.init_data = json.loads(response.content[0].text)
+        response = await self._call_tool(ToolType.CREATE_APP_ENVIRONMENT, {})
+        self.init_data = await _loads(response.content[0].text)
 
     async def load_code(self, sandbox_id: str):
-        async with mcp_session(self.mcp_url) as session:
-            response: CallToolResult = await session.call_tool(
-                name=ToolType.LOAD_CODE.value,
-                arguments={"sandbox_id": sandbox_id},
-            )
-            return json.loads(response.content[0].text)
-
-    async def edit_code(self, sandbox_id: str, code_map: dict):
-        async with mcp_session(self.mcp_url) as session:
-            response: CallToolResult = await session.call_tool(
-                name=ToolType.EDIT_CODE.value,
-                arguments={
-                    "sandbox_id": sandbox_id,
-                    "code_map": code_map,
-                },
-            )
-            return json.loads(response.content[0].text)
+        response = await self._call_tool(
+            ToolType.LOAD_CODE, {"sandbox_id": sandbox_id}
+        )
+        return await _loads(response.content[0].text)
+
+    async def stage_code(self, sandbox_id: str, staging_id: str, code_map: dict):
+        response = await self._call_tool(
+            ToolType.STAGE_CODE,
+            {
+                "sandbox_id": sandbox_id,
+                "staging_id": staging_id,
+                "code_map": code_map,
+            },
+        )
+        return await _loads(response.content[0].text)
+
+    async def commit_code(self, sandbox_id: str, staging_id: str):
+        response = await self._call_tool(
+            ToolType.COMMIT_CODE,
+            {"sandbox_id": sandbox_id, "staging_id": staging_id},
+        )
+        return await _loads(response.content[0].text)
+
+    async def discard_code(self, sandbox_id: str, staging_id: str):
+        response = await self._call_tool(
+            ToolType.DISCARD_CODE,
+            {"sandbox_id": sandbox_id, "staging_id": staging_id},
+        )
+        return await _loads(response.content[0].text)
 
     async def get_code_for_display(self, sandbox_id: str):
-        async with mcp_session(self.mcp_url) as session:
-            response: CallToolResult = await session.call_tool(
-                name=ToolType.GET_CODE_FOR_DISPLAY.value,
-                arguments={"sandbox_id": sandbox_id},
-            )
-            return json.loads(response.content[0].text)
+        response = await self._call_tool(
+            ToolType.GET_CODE_FOR_DISPLAY, {"sandbox_id": sandbox_id}
+        )
+        return await _loads(response.content[0].text)
 
     async def add_to_history(self, user_feedback: str, agent_plan: str):
-        self.history.append(
-            {
-                "role": "user",
-                "content": user_feedback,
-            }
-        )
+        if len(self.history) + 2 > HISTORY_WINDOW:
+            # Evict the oldest turn ourselves so it can be summarized rather than dropped
+            evicted = [self.history.popleft(), self.history.popleft()]
+            self._summary_task = asyncio.create_task(
+                self._fold_into_summary(evicted, self._summary_task)
+            )
 
-        self.history.append(
-            {
-                "role": "assistant",
-                "content": agent_plan,
-            }
+        # Stored as ready-made BAML messages so get_history() doesn't rebuild them every turn
+        self.history.append(ConvoMessage(role="user", content=user_feedback))
+        self.history.append(ConvoMessage(role="assistant", content=agent_plan))
+
+    async def _fold_into_summary(
+        self, evicted: list[ConvoMessage], previous: asyncio.Task | None
+    ):
+        # Summaries are chained so evicted turns are folded in order
+        if previous is not None:
+            await previous
+
+        try:
+            self._summary = await self.model_client.SummarizeHistory(
+                self._summary, evicted
+            )
+        except Exception as e:
+            print(f"Error summarizing history: {e}")
+            return
+
+        self._summary_message = ConvoMessage(
+            role="system",
+            content=f"Summary of the earlier conversation:\n{self._summary}",
         )
 
-    def get_history(self):
-        return [
-            ConvoMessage(role=msg["role"], content=msg["content"])
-            for msg in self.history
-        ]
+    async def get_history(self) -> list[ConvoMessage]:
+        if self._summary_task is not None:
+            await self._summary_task
+
+        if self._summary_message is not None:
+            return [self._summary_message, *self.history]
+        return list(self.history)
 
     async def send_feedback(self, feedback: str):
         """
@@ -176,14 +278,18 @@ class Agent:
         # Step 2: Load current codebase from sandbox via MCP tools
         # This ensures AI has complete context of existing code
         code_map, package_json = await self.load_code(self.init_data["sandbox_id"])
+        old_hashes = {path: _content_digest(content) for path, content in code_map.items()}
 
         # Step 3: Format code files for BAML Client consumption
-        code_files = []
-        for path, content in code_map.items():
-            code_files.append({"path": path, "content": content})
+        # The files are rendered right after the system prompt and ahead of the
+        # history, so sorting them by path keeps that prefix byte-identical across
+        # turns up to the first file that changed
+        code_files = [
+            {"path": path, "content": code_map[path]} for path in sorted(code_map)
+        ]
 
         # Step 4: Get conversation history for multi-turn context
-        history = self.get_history()
+        history = await self.get_history()
         
         # Step 5: 
         # BAML provides RPC-like interface to OpenAI, handling:
@@ -195,47 +301,101 @@ class Agent:
         )
         sent_plan = False
 
-        new_code_map = {}
-        plan_msg_id = str(uuid.uuid4())
-        file_msg_id = str(uuid.uuid4())
-
-        # Step 6: Process streamed AI responses in real-time
-        for partial in stream:
-            # Stream AI's planning/explanation to frontend
-            if partial.plan.state != "Complete" and not sent_plan:
-                yield Message.new(
-                    MessageType.AGENT_PARTIAL,
-                    {"text": partial.plan.value},
-                    id=plan_msg_id,
-                ).to_dict()
-
-            # Send final AI plan when complete
-            if partial.plan.state == "Complete" and not sent_plan:
-                yield Message.new(
-                    MessageType.AGENT_FINAL,
-                    {"text": partial.plan.value},
-                    id=plan_msg_id,
-                ).to_dict()
-
-                # Add to conversation history for future context
-                await self.add_to_history(feedback, partial.plan.value)
-                sent_plan = True
-
-            # Process generated code files
-            for file in partial.files:
-                if file.path not in new_code_map:
+        sandbox_id = self.init_data["sandbox_id"]
+        # Files are staged as they stream in and applied together once the turn ends
+        staging_id = uuid.uuid4().hex
+        files_done = 0
+        per_file_seen: set[str] = set()
+        # Completed files waiting to be staged, and the single in-flight stage_code
+        # call; files that complete while it runs go out together in the next batch
+        pending_uploads: dict[str, str] = {}
+        upload_task: asyncio.Task | None = None
+        staged = False
+        committed = False
+        plan_msg_id = uuid.uuid4().hex
+        file_msg_id = uuid.uuid4().hex
+
+        try:
+            # Step 6: Process streamed AI responses in real-time
+            # The async client yields partials without blocking the event loop, so other
+            # websocket sessions on this worker keep making progress during generation
+            async for partial in stream:
+                # Stream AI's planning/explanation to frontend
+                if partial.plan.state != "Complete" and not sent_plan:
+                    yield _agent_partial(plan_msg_id, partial.plan.value)
+
+                # Send final AI plan when complete
+                if partial.plan.state == "Complete" and not sent_plan:
+                    yield Message.new(
+                        MessageType.AGENT_FINAL,
+                        {"text": partial.plan.value},
+                        id=plan_msg_id,
+                    ).to_dict()
+
+                    # Add to conversation history for future context
+                    await self.add_to_history(feedback, partial.plan.value)
+                    sent_plan = True
+
+                # Process generated code files
+                # File is marked @@stream.done, so a file only shows up in the stream once
+                # it is complete and can be uploaded while the model keeps generating.
+                # The list of completed files only grows, so each partial only needs its
+                # newly completed tail rather than a rescan of every file
+                new_files = partial.files[files_done:]
+                files_done += len(new_files)
+
+                for file in new_files:
+                    path = file.path
+                    if path in per_file_seen:
+                        continue
+                    per_file_seen.add(path)
+
                     # Notify frontend about file being worked on
                     yield Message.new(
                         MessageType.UPDATE_FILE,
-                        {"text": f"Working on {file.path}"},
+                        {"text": f"Working on {path}"},
                         id=file_msg_id,
                     ).to_dict()
 
-                    new_code_map[file.path] = file.content
-
-        # Step 7: Apply all code changes to sandbox via MCP tools
-        # This triggers the dev server restart and live preview update
-        await self.edit_code(self.init_data["sandbox_id"], new_code_map)
+                    # Skip files the model re-emitted byte-for-byte unchanged
+                    if old_hashes.get(path) != _content_digest(file.content):
+                        pending_uploads[path] = file.content
+
+                if pending_uploads and (upload_task is None or upload_task.done()):
+                    if upload_task is not None:
+                        # Surface a failed batch before staging the next one
+                        await upload_task
+                    upload_task = asyncio.create_task(
+                        self.stage_code(sandbox_id, staging_id, pending_uploads)
+                    )
+                    pending_uploads = {}
+                    staged = True
+
+            # Step 7: Stage whatever is left, then swap everything into the app in
+            # one step
+            # This triggers the dev server restart and live preview update
+            if upload_task is not None:
+                await upload_task
+            if pending_uploads:
+                await self.stage_code(sandbox_id, staging_id, pending_uploads)
+                staged = True
+
+            # Q&A turns and turns that only re-emit unchanged files skip the sandbox entirely
+            if staged:
+                await self.commit_code(sandbox_id, staging_id)
+            committed = True
+        finally:
+            # The stream failed or the client went away mid-turn: drop whatever was
+            # already staged. Cancelling the in-flight batch would only stop us waiting,
+            # the server would still write it and could recreate the staging dir after
+            # the discard, so let it land first (its failure is moot at this point)
+            if upload_task is not None:
+                await asyncio.gather(upload_task, return_exceptions=True)
+            if staged and not committed:
+                try:
+                    await self.discard_code(sandbox_id, staging_id)
+                except Exception as e:
+                    print(f"Error discarding staged code {staging_id}: {e}")
 
         # Step 8: Notify frontend that all updates are complete
         yield Message.new(MessageType.UPDATE_COMPLETED, {}).to_dict()
@@ -243,6 +403,12 @@ class Agent:
 
 async def _load_agent():
     agent = Agent(mcp_url=os.getenv("LOVABLE_MCP_URL", "https://lovable-mcp-server-6b17ffd-v1.app.beam.cloud/sse"))
+    # A brief MCP outage during a cold start shouldn't keep the worker from starting;
+    # tool calls open their own session on demand and nothing needs the tool list up front
+    try:
+        await agent.load_tools()
+    except Exception as e:
+        print(f"Error loading MCP tools, continuing without them: {e}")
     print("Loaded agent")
     return agent
 
@@ -260,7 +426,7 @@ async def _load_agent():
 )
 async def handler(event, context):
     agent: Agent = context.on_start_value
-    msg = json.loads(event)
+    msg = orjson.loads(event)
 
     match msg.get("type"):
         case MessageType.USER.value:
@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 
 from mcp.client.session import ClientSession
 from mcp.client.sse import sse_client
@@ -7,8 +8,70 @@ from mcp.client.sse import sse_client
 logger = logging.getLogger(__name__)
 
 
-@asynccontextmanager
-async def mcp_session(url: str):
-    async with sse_client(url) as (read, write), ClientSession(read, write) as session:
-        await session.initialize()
-        yield session
+@dataclass(slots=True)
+class _SessionEntry:
+    """
+    A session owned by a dedicated task. anyio cancel scopes must be exited in
+    the task that entered them, so the SSE connection is opened and closed
+    inside owner and other tasks only borrow the session.
+    """
+
+    loop: asyncio.AbstractEventLoop
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    stop: asyncio.Event = field(default_factory=asyncio.Event)
+    session: ClientSession | None = None
+    error: BaseException | None = None
+    owner: asyncio.Task | None = None
+
+
+# Initialized sessions shared per MCP URL, so the SSE connect + initialize
+# handshake is paid once per process rather than once per Agent or tool call
+_sessions: dict[str, _SessionEntry] = {}
+
+
+async def _own_session(url: str, entry: _SessionEntry):
+    try:
+        async with sse_client(url) as (read, write), ClientSession(read, write) as session:
+            await session.initialize()
+            logger.info("Opened MCP session for %s", url)
+            entry.session = session
+            entry.ready.set()
+            await entry.stop.wait()
+    except BaseException as e:
+        entry.error = e
+        if not isinstance(e, Exception):
+            raise
+    finally:
+        entry.session = None
+        entry.ready.set()
+        if _sessions.get(url) is entry:
+            del _sessions[url]
+
+
+async def get_session(url: str) -> ClientSession:
+    loop = asyncio.get_running_loop()
+    entry = _sessions.get(url)
+    # No await between the lookup and the insert, so concurrent callers share one owner
+    if entry is None or entry.loop is not loop or entry.owner.done():
+        entry = _SessionEntry(loop=loop)
+        entry.owner = asyncio.create_task(_own_session(url, entry))
+        _sessions[url] = entry
+
+    await entry.ready.wait()
+    if entry.session is None:
+        raise ConnectionError(f"MCP session for {url} is closed") from entry.error
+    return entry.session
+
+
+async def close_session(url: str, session: ClientSession | None = None):
+    # When a session is given, only close it if it is still the cached one, so a
+    # stale caller can't tear down a session another caller already reopened
+    entry = _sessions.get(url)
+    if entry is None or (session is not None and entry.session is not session):
+        return
+    del _sessions[url]
+
+    entry.stop.set()
+    await asyncio.gather(entry.owner, return_exceptions=True)
+    if entry.error is not None:
+        logger.warning("MCP session for %s closed with error: %s", url, entry.error)
@@ -1,5 +1,10 @@
-import tempfile
-from pathlib import Path
+import asyncio
+import base64
+import io
+import shlex
+import tarfile
+import time
+import uuid
 
 from beam import Image, Sandbox
 from beam.integrations import MCPServer
@@ -21,10 +26,30 @@ image = (
 
 DEFAULT_CODE_PATH = "/app/src"
 DEFAULT_PROJECT_ROOT = "/app"
+# Largest base64 payload passed inline to a single exec, safely under the
+# kernel's 128 KiB limit on one argv entry
+MAX_EXEC_PAYLOAD = 96 * 1024
+
+# File types shown in the frontend code viewer
+DISPLAY_EXTENSIONS = frozenset({".tsx", ".ts", ".jsx", ".js", ".css", ".json", ".html"})
+# Dependency/build/VCS directories never worth walking or transferring
+SKIP_DIRS = frozenset({"node_modules", ".git", "dist", ".next"})
+
+# Edits are staged outside /app so Vite's watcher ignores them until they are
+# copied into place in one go, giving one HMR cycle per edit instead of one per file
+STAGING_ROOT = "/tmp"
+
+# Number of ready-to-use app environments kept booted ahead of demand
+SANDBOX_POOL_SIZE = 3
+# Pooled sandboxes have their TTL refreshed this often while they wait, well inside
+# their 300s keep_warm, so an idle pool stays ready to hand out
+SANDBOX_POOL_REFRESH_SECONDS = 120
+# Pooled sandboxes whose last refresh is older than this are terminated instead
+SANDBOX_POOL_MAX_AGE_SECONDS = 240
 
 
 @mcp.tool
-def create_app_environment() -> dict:
+async def create_app_environment() -> dict:
     """
     MCP TOOL: CREATE_APP_ENVIRONMENT
     
@@ -40,7 +65,40 @@ def create_app_environment() -> dict:
     URL GENERATION: Beam Cloud's expose_port(3000) creates unique public URL
     Format: https://sandbox-{id}.beam.cloud 
     This URL is embedded in frontend's iframe for live preview
+
+    Sandboxes are booted ahead of time into a small pool, so this normally just
+    hands out an environment whose dev server is already running
     """
+    pool = _get_sandbox_pool()
+    while True:
+        environment = await pool.get()
+        _refill_sandbox_pool()
+
+        if isinstance(environment, BaseException):
+            raise environment
+
+        sandbox_id = environment["sandbox_id"]
+        refreshed_at = _pool_refreshed_at.pop(sandbox_id)
+
+        # A sandbox whose background refreshes kept failing may be gone before it is
+        # used, so shut it down and take the next one
+        if time.monotonic() - refreshed_at >= SANDBOX_POOL_MAX_AGE_SECONDS:
+            _terminate_sandbox(sandbox_id)
+            continue
+
+        # Restart the TTL clock so the caller gets the full window, not what's left of it
+        try:
+            await _connect_sandbox(sandbox_id)
+        except Exception as e:
+            print(f"Error refreshing pooled app environment {sandbox_id}: {e}")
+            _terminate_sandbox(sandbox_id)
+            continue
+
+        print(f"Handing out app environment {sandbox_id}")
+        return environment
+
+
+def _boot_app_environment() -> dict:
     print("Creating app environment...")
 
     # Create isolated sandbox environment with upgraded resources
@@ -73,112 +131,337 @@ def create_app_environment() -> dict:
     }
 
 
-@mcp.tool
-def load_code(sandbox_id: str) -> tuple[dict, str]:
-    print(f"Loading code for sandbox {sandbox_id}")
+# Pre-booted app environments, created lazily on the server's event loop
+_sandbox_pool: asyncio.Queue | None = None
+# sandbox_id -> monotonic time its TTL was last refreshed, for sandboxes still pooled
+_pool_refreshed_at: dict[str, float] = {}
+_pool_tasks: set[asyncio.Task] = set()
+
+
+def _get_sandbox_pool() -> asyncio.Queue:
+    global _sandbox_pool
+    if _sandbox_pool is None:
+        _sandbox_pool = asyncio.Queue()
+        for _ in range(SANDBOX_POOL_SIZE):
+            _refill_sandbox_pool()
+    return _sandbox_pool
+
+
+def _refill_sandbox_pool():
+    async def _boot():
+        try:
+            environment = await asyncio.to_thread(_boot_app_environment)
+        except Exception as e:
+            print(f"Error pre-warming app environment: {e}")
+            await _sandbox_pool.put(e)
+            return
 
-    sandbox = Sandbox().connect(sandbox_id)
-    sandbox.update_ttl(300)
+        sandbox_id = environment["sandbox_id"]
+        _pool_refreshed_at[sandbox_id] = time.monotonic()
+        await _sandbox_pool.put(environment)
+
+        # Keep the sandbox's TTL topped up until create_app_environment takes it
+        while True:
+            await asyncio.sleep(SANDBOX_POOL_REFRESH_SECONDS)
+            if sandbox_id not in _pool_refreshed_at:
+                return
+            try:
+                await _connect_sandbox(sandbox_id)
+            except Exception as e:
+                print(f"Error refreshing pooled app environment {sandbox_id}: {e}")
+                continue
+            if sandbox_id in _pool_refreshed_at:
+                _pool_refreshed_at[sandbox_id] = time.monotonic()
+
+    # Keep a reference so the task isn't garbage collected mid-boot
+    task = asyncio.create_task(_boot())
+    _pool_tasks.add(task)
+    task.add_done_callback(_pool_tasks.discard)
+
+
+def _terminate_sandbox(sandbox_id: str):
+    """Shut down a sandbox in the background, best effort"""
+
+    def _terminate():
+        try:
+            Sandbox().connect(sandbox_id).terminate()
+        except Exception as e:
+            print(f"Error terminating app environment {sandbox_id}: {e}")
+
+    task = asyncio.create_task(asyncio.to_thread(_terminate))
+    _pool_tasks.add(task)
+    task.add_done_callback(_pool_tasks.discard)
+
+
+async def _connect_sandbox(sandbox_id: str) -> Sandbox:
+    """Connect to a sandbox and refresh its TTL without blocking the event loop"""
+
+    def _connect() -> Sandbox:
+        sandbox = Sandbox().connect(sandbox_id)
+        sandbox.update_ttl(300)
+        return sandbox
+
+    return await asyncio.to_thread(_connect)
+
+
+def _find_files_command(root: str, extensions: frozenset[str] | None = None) -> str:
+    """Shell command printing NUL-separated file paths under root, pruning SKIP_DIRS"""
+    prune = " -o ".join(f"-name {shlex.quote(name)}" for name in sorted(SKIP_DIRS))
+    command = f"find {shlex.quote(root)} -type d \\( {prune} \\) -prune -o -type f"
+    if extensions is not None:
+        names = " -o ".join(f"-name {shlex.quote('*' + ext)}" for ext in sorted(extensions))
+        command += f" \\( {names} \\)"
+    return command + " -print0"
+
+
+def _read_stream(stream) -> str:
+    """Drain a finished process's stdout/stderr, which may hand back one chunk per read"""
+    chunks = []
+    while chunk := stream.read():
+        chunks.append(chunk)
+    return "".join(chunks)
+
+
+def _read_files(
+    sandbox: Sandbox,
+    root: str,
+    extra_files: tuple[str, ...] = (),
+    extensions: frozenset[str] | None = None,
+    lenient: bool = False,
+) -> dict[str, bytes]:
+    """
+    Fetch every file under root (plus extra_files) with a single exec, by streaming
+    a base64-encoded tar of the tree back over stdout. Keys are absolute paths.
+
+    Raises RuntimeError if any step fails; with lenient=True unreadable or missing
+    files are skipped instead.
+    """
+    extras = "".join(f"printf '%s\\000' {shlex.quote(path)}; " for path in extra_files)
+    find = _find_files_command(root, extensions)
+    archive = 'tar --null -P -T "$tmp/files" -cf "$tmp/archive"'
+    if lenient:
+        find += " || true"
+        archive += " --ignore-failed-read"
+    # sh has no pipefail, so each step writes to a temp file and set -e catches failures
+    command = (
+        'set -e; tmp=$(mktemp -d); trap \'rm -rf "$tmp"\' EXIT; '
+        f'{{ {find}; {extras}}} > "$tmp/files"; {archive}; base64 -w0 "$tmp/archive"'
+    )
+
+    process = sandbox.process.exec("sh", "-c", command)
+    exit_code = process.wait()
+    output = _read_stream(process.stdout)
+    if exit_code:
+        error = _read_stream(process.stderr).strip()
+        raise RuntimeError(f"Reading files under {root} failed with exit code {exit_code}: {error}")
+
+    tar_bytes = base64.b64decode(output)
+    if not tar_bytes:
+        return {}
 
     file_map = {}
+    with tarfile.open(fileobj=io.BytesIO(tar_bytes)) as tar:
+        for member in tar:
+            if member.isfile():
+                file_map[member.name] = tar.extractfile(member).read()
+
+    return file_map
 
-    def _process_directory(dir_path: str):
-        for file in sandbox.fs.list_files(dir_path):
-            full_path = Path(dir_path) / file.name
-
-            if file.is_dir:
-                # Recursively process subdirectories
-                _process_directory(str(full_path))
-            else:
-                # Download file
-                with tempfile.NamedTemporaryFile() as temp_file:
-                    sandbox.fs.download_file(str(full_path), temp_file.name)
-                    temp_file.seek(0)
-                    file_content = temp_file.read()
-                    file_map[str(full_path)] = file_content
-
-    _process_directory(DEFAULT_CODE_PATH)
-
-    package_json = "{}"
-    with tempfile.NamedTemporaryFile() as temp_file:
-        sandbox.fs.download_file(f"{DEFAULT_PROJECT_ROOT}/package.json", temp_file.name)
-        temp_file.seek(0)
-        package_json = temp_file.read().decode("utf-8")
 
+def _write_files(sandbox: Sandbox, files: dict[str, str]):
+    """
+    Write every file (absolute path -> text) with a single exec by piping a
+    base64-encoded tar into tar -x; tar creates any missing parent directories
+    """
+    buffer = io.BytesIO()
+    mtime = int(time.time())
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for path, content in files.items():
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(path.lstrip("/"))
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(data))
+
+    payload = base64.b64encode(buffer.getvalue()).decode("ascii")
+    extract = "tar --no-same-owner -xf - -C /"
+
+    if len(payload) <= MAX_EXEC_PAYLOAD:
+        command = f"printf %s {payload} | base64 -d | {extract}"
+        exit_code = sandbox.process.exec("sh", "-c", command).wait()
+    else:
+        # A single argv entry is capped at 128 KiB, so spool larger payloads into a
+        # file chunk by chunk and extract from there
+        spool = f"{STAGING_ROOT}/.upload-{uuid.uuid4().hex}.b64"
+        try:
+            for start in range(0, len(payload), MAX_EXEC_PAYLOAD):
+                chunk = payload[start : start + MAX_EXEC_PAYLOAD]
+                exit_code = sandbox.process.exec(
+                    "sh", "-c", f"printf %s {chunk} >> {spool}"
+                ).wait()
+                if exit_code:
+                    raise RuntimeError(
+                        f"Appending to upload spool {spool} failed with exit code {exit_code}"
+                    )
+
+            command = f"base64 -d {spool} | {extract}"
+            exit_code = sandbox.process.exec("sh", "-c", command).wait()
+        finally:
+            try:
+                sandbox.process.exec("rm", "-f", spool).wait()
+            except Exception as e:
+                print(f"Error removing upload spool {spool}: {e}")
+
+    if exit_code:
+        raise RuntimeError(f"Writing {len(files)} files failed with exit code {exit_code}")
+
+
+@mcp.tool
+async def load_code(sandbox_id: str) -> tuple[dict, str]:
+    print(f"Loading code for sandbox {sandbox_id}")
+
+    sandbox = await _connect_sandbox(sandbox_id)
+
+    # Fetch the whole tree plus package.json in one round-trip
+    package_json_path = f"{DEFAULT_PROJECT_ROOT}/package.json"
+    file_map = await asyncio.to_thread(
+        _read_files, sandbox, DEFAULT_CODE_PATH, (package_json_path,)
+    )
+
+    package_json = file_map.pop(package_json_path).decode("utf-8")
     return file_map, package_json
 
 
+def _staging_dir(staging_id: str) -> str:
+    if not staging_id.isalnum():
+        raise ValueError(f"Invalid staging id: {staging_id!r}")
+    return f"{STAGING_ROOT}/.staging-{staging_id}"
+
+
+async def _stage_files(sandbox: Sandbox, staging_dir: str, code_map: dict):
+    """Upload code_map into staging_dir, mirroring each file's absolute sandbox path"""
+    staged = {
+        f"{staging_dir}/{sandbox_path.lstrip('/')}": content
+        for sandbox_path, content in code_map.items()
+    }
+
+    await asyncio.to_thread(_write_files, sandbox, staged)
+
+
+def _commit_staging(sandbox: Sandbox, staging_dir: str):
+    """Move every staged file into place in one exec so Vite sees a single batch of changes"""
+    staging_dir = shlex.quote(staging_dir)
+    # Unlike cp -a, archiving only non-directories leaves the mode, owner and mtime of
+    # existing directories such as /tmp alone; missing parents are created as needed.
+    # Each step writes to a temp file because sh has no pipefail
+    command = (
+        'set -e; tmp=$(mktemp -d); trap \'rm -rf "$tmp"\' EXIT; '
+        f'(cd {staging_dir} && find . ! -type d -print0) > "$tmp/files"; '
+        f'tar -C {staging_dir} --null -T "$tmp/files" -cf "$tmp/archive"; '
+        'tar -C / --no-overwrite-dir --no-same-owner -xf "$tmp/archive"; '
+        f"rm -rf {staging_dir}"
+    )
+
+    process = sandbox.process.exec("sh", "-c", command)
+    exit_code = process.wait()
+    if exit_code:
+        error = _read_stream(process.stderr).strip()
+        raise RuntimeError(f"Committing {staging_dir} failed with exit code {exit_code}: {error}")
+
+
 @mcp.tool
-def edit_code(sandbox_id: str, code_map: dict) -> dict:
+async def edit_code(sandbox_id: str, code_map: dict) -> dict:
     print(f"Editing code for sandbox {sandbox_id}")
 
-    sandbox = Sandbox().connect(sandbox_id)
-    sandbox.update_ttl(300)
+    if not code_map:
+        return {"sandbox_id": sandbox_id}
 
-    for sandbox_path, content in code_map.items():
-        with tempfile.NamedTemporaryFile() as temp_file:
-            temp_file.write(content.encode("utf-8"))
-            temp_file.seek(0)
+    sandbox = await _connect_sandbox(sandbox_id)
 
-            # Get parent directory and check if it exists
-            parent_dir = str(Path(sandbox_path).parent)
-            try:
-                sandbox.fs.stat_file(parent_dir)
-            except BaseException:
-                # Parent directory doesn't exist, create it
-                print(f"Creating parent directory: {parent_dir}")
-                sandbox.process.exec("mkdir", "-p", parent_dir).wait()
+    staging_dir = _staging_dir(uuid.uuid4().hex)
+    await _stage_files(sandbox, staging_dir, code_map)
+    await asyncio.to_thread(_commit_staging, sandbox, staging_dir)
+
+    return {"sandbox_id": sandbox.sandbox_id()}
+
+
+@mcp.tool
+async def stage_code(sandbox_id: str, staging_id: str, code_map: dict) -> dict:
+    """Upload files into a staging area without touching the live app; see commit_code"""
+    print(f"Staging code for sandbox {sandbox_id}")
 
-            sandbox.fs.upload_file(temp_file.name, sandbox_path)
+    sandbox = await _connect_sandbox(sandbox_id)
+
+    await _stage_files(sandbox, _staging_dir(staging_id), code_map)
+
+    return {"sandbox_id": sandbox.sandbox_id()}
+
+
+@mcp.tool
+async def commit_code(sandbox_id: str, staging_id: str) -> dict:
+    """Apply everything staged under staging_id to the live app in one step"""
+    print(f"Committing staged code for sandbox {sandbox_id}")
+
+    sandbox = await _connect_sandbox(sandbox_id)
+
+    await asyncio.to_thread(_commit_staging, sandbox, _staging_dir(staging_id))
+
+    return {"sandbox_id": sandbox.sandbox_id()}
+
+
+@mcp.tool
+async def discard_code(sandbox_id: str, staging_id: str) -> dict:
+    """Throw away everything staged under staging_id without applying it"""
+    print(f"Discarding staged code for sandbox {sandbox_id}")
+
+    sandbox = await _connect_sandbox(sandbox_id)
+    staging_dir = _staging_dir(staging_id)
+
+    await asyncio.to_thread(
+        lambda: sandbox.process.exec("rm", "-rf", staging_dir).wait()
+    )
 
     return {"sandbox_id": sandbox.sandbox_id()}
 
 
 @mcp.tool
-def get_code_for_display(sandbox_id: str) -> dict:
+async def get_code_for_display(sandbox_id: str) -> dict:
     """Fetch code files from sandbox for display in the frontend"""
     print(f"Getting code for display from sandbox {sandbox_id}")
     
-    sandbox = Sandbox().connect(sandbox_id)
-    sandbox.update_ttl(300)
-    
-    file_map = {}
-    
-    def _process_directory(dir_path: str):
-        try:
-            for file in sandbox.fs.list_files(dir_path):
-                full_path = Path(dir_path) / file.name
-                
-                if file.is_dir:
-                    # Recursively process subdirectories
-                    _process_directory(str(full_path))
-                else:
-                    # Only include certain file types for display
-                    if full_path.suffix in ['.tsx', '.ts', '.jsx', '.js', '.css', '.json', '.html']:
-                        try:
-                            with tempfile.NamedTemporaryFile() as temp_file:
-                                sandbox.fs.download_file(str(full_path), temp_file.name)
-                                temp_file.seek(0)
-                                file_content = temp_file.read().decode('utf-8')
-                                # Convert to relative path for display
-                                relative_path = str(full_path).replace(DEFAULT_CODE_PATH + "/", "")
-                                file_map[relative_path] = file_content
-                        except Exception as e:
-                            print(f"Error reading file {full_path}: {e}")
-        except Exception as e:
-            print(f"Error listing directory {dir_path}: {e}")
-    
-    _process_directory(DEFAULT_CODE_PATH)
+    sandbox = await _connect_sandbox(sandbox_id)
     
+    # Only include certain file types for display
     # Also get package.json for reference
+    package_json_path = f"{DEFAULT_PROJECT_ROOT}/package.json"
     try:
-        with tempfile.NamedTemporaryFile() as temp_file:
-            sandbox.fs.download_file(f"{DEFAULT_PROJECT_ROOT}/package.json", temp_file.name)
-            temp_file.seek(0)
-            package_json = temp_file.read().decode("utf-8")
-            file_map["package.json"] = package_json
+        contents = await asyncio.to_thread(
+            _read_files,
+            sandbox,
+            DEFAULT_CODE_PATH,
+            (package_json_path,),
+            DISPLAY_EXTENSIONS,
+            lenient=True,
+        )
     except Exception as e:
-        print(f"Error reading package.json: {e}")
+        print(f"Error reading files from {DEFAULT_CODE_PATH}: {e}")
+        contents = {}
+
+    file_map = {}
+    for path, content in contents.items():
+        try:
+            file_content = content.decode("utf-8")
+        except UnicodeDecodeError as e:
+            print(f"Error reading file {path}: {e}")
+            continue
+
+        if path == package_json_path:
+            file_map["package.json"] = file_content
+        else:
+            # Convert to relative path for display
+            relative_path = path.replace(DEFAULT_CODE_PATH + "/", "")
+            file_map[relative_path] = file_content
     
     return {
         "sandbox_id": sandbox_id,